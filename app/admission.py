@@ -0,0 +1,58 @@
+import threading
+from contextlib import contextmanager
+from typing import Generator, Optional
+
+
+class AdmissionError(Exception):
+    """
+    Raised when a request is shed by admission control, or can't be served.
+    """
+
+    def __init__(self, retry_after: int, reason: str = "Service overloaded"):
+        super().__init__(f"{reason}, retry after {retry_after} seconds")
+        self.retry_after: int = retry_after
+
+
+class Admission:
+    """
+    Bounded admission queue.
+    At most CONCURRENCY requests run at once, at most QUEUE_SIZE wait for
+    a slot, and nobody waits longer than WAIT seconds.
+    Waiting requests hold a server thread, so CONCURRENCY + QUEUE_SIZE
+    must stay below the number of threads of each server worker.
+    """
+
+    CONCURRENCY: int = 2
+    QUEUE_SIZE: int = 4
+    WAIT: float = 2.0
+    RETRY_AFTER: int = 5
+
+    def __init__(self):
+        """
+        Admission constructor.
+        """
+        self.slots: threading.BoundedSemaphore = threading.BoundedSemaphore(self.CONCURRENCY)
+        self.lock: threading.Lock = threading.Lock()
+        self.waiting: int = 0
+
+    @contextmanager
+    def admit(self, wait: Optional[float] = None) -> Generator[None, None, None]:
+        """
+        Runs a block once a slot is free, or raises AdmissionError.
+        The wait may be shortened, for example to fit a request deadline.
+        """
+        with self.lock:
+            if self.waiting >= self.QUEUE_SIZE:
+                raise AdmissionError(self.RETRY_AFTER)
+            self.waiting += 1
+        try:
+            acquired: bool = self.slots.acquire(timeout=self.WAIT if wait is None else min(self.WAIT, wait))
+        finally:
+            with self.lock:
+                self.waiting -= 1
+        if not acquired:
+            raise AdmissionError(self.RETRY_AFTER)
+        try:
+            yield
+        finally:
+            self.slots.release()
@@ -5,6 +5,7 @@ from typing import Union
 import requests
 
 from .post import Post
+from .transport import Transport
 
 
 class Blog:
@@ -41,10 +42,11 @@ class Blog:
         """
         url: str = f"{self.api}/{endpoint}"
         print("GET:", url, params)
-        response: requests.Response = requests.get(
+        response: requests.Response = Transport.get(
             url=url,
             params=params,
             auth=self.auth,
+            idempotent=True,
         )
         print(response.status_code, response.reason)
         print(response.headers)
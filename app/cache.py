@@ -10,11 +10,13 @@ class Cache:
 
     PATH: str = os.path.join(os.sep, "tmp")
 
-    def __init__(self, key: str):
+    def __init__(self, key: str, path: str = ""):
         """
         Cache constructor.
         """
         self.key: str = key
+        if path:
+            self.PATH = path
         if not os.path.isdir(self.PATH):
             raise OSError('Not found:', self.PATH)
 
@@ -0,0 +1,35 @@
+import json
+import threading
+from typing import Generator
+
+
+class Capture:
+    """
+    Append-only log of /ask traffic, one compact JSON object per line.
+    """
+
+    def __init__(self, path: str):
+        """
+        Capture constructor.
+        """
+        self.path: str = path
+        self.lock: threading.Lock = threading.Lock()
+
+    def append(self, record: dict):
+        """
+        Appends a record to the capture file.
+        """
+        line: str = json.dumps(record, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        with self.lock:
+            with open(self.path, "a", encoding='utf-8') as file_handler:
+                file_handler.write(line + "\n")
+
+    @classmethod
+    def read(cls, path: str) -> Generator[dict, None, None]:
+        """
+        Iterates over the records of a capture file.
+        """
+        with open(path, "r", encoding='utf-8') as file_handler:
+            for line in file_handler:
+                if line.strip():
+                    yield json.loads(line)
@@ -1,9 +1,12 @@
 import json
+import math
+import hashlib
 import requests
-from typing import List, Dict
+from typing import List, Dict, Optional
 from .vector import Vector
 from .post import Post
 from .cache import Cache
+from .transport import Transport
 
 
 class Cluster:
@@ -12,7 +15,7 @@ class Cluster:
     """
 
     MAX_SEARCH_SIZE: int = 20
-    MAX_DOC_ID_SIZE: int = 5
+    MAX_DOC_ID_SIZE: int = 512
     MAX_DISCOVERY_SPACE_SIZE: int = 200
 
     def __init__(self):
@@ -23,6 +26,7 @@ class Cluster:
         self.hostname: str = "localhost"
         self.port: int = 9200
         self.index: str = "default"
+        self.cache_dir: str = ""
 
     @property
     def api(self) -> str:
@@ -31,15 +35,18 @@ class Cluster:
         """
         return f"{self.protocol}://{self.hostname}:{self.port}"
 
-    def post(self, endpoint: str, payload: dict) -> dict:
+    def post(self, endpoint: str, payload: dict, deadline: Optional[float] = None) -> dict:
         """
         Sends POST requests to Elasticsearch.
         """
         url: str = f"{self.api}/{endpoint}"
         print("POST:", url, payload)
-        response: requests.Response = requests.post(
+        response: requests.Response = Transport.post(
             url=url,
             json=payload,
+            deadline=deadline,
+            idempotent=True,
+            compress=True,
         )
         print(response.status_code, response.reason)
         print(response.headers)
@@ -54,9 +61,11 @@ class Cluster:
         """
         url: str = f"{self.api}/{endpoint}"
         print("PUT:", url, payload)
-        response: requests.Response = requests.put(
+        response: requests.Response = Transport.put(
             url=url,
             json=payload,
+            idempotent=True,
+            compress=True,
         )
         print(response.status_code, response.reason)
         print(response.headers)
@@ -78,13 +87,14 @@ class Cluster:
                         "index": True,
                         "similarity": "cosine",
                     },
-                    "word": {
+                    "keyword": {
                         "type": "keyword",
-                        "index": False,
                     },
                     "slug": {
                         "type": "keyword",
-                        "index": False,
+                    },
+                    "weight": {
+                        "type": "float",
                     }
                 }
             }
@@ -95,34 +105,84 @@ class Cluster:
             if "resource_already_exists_exception" not in str(error):
                 raise
 
-    def save(self, post: Post):
+    def documents(self, post: Post) -> Dict[str, dict]:
         """
-        Indexes a Post in Elasticsearch.
+        Builds the Elasticsearch documents of a Post, one per unique word.
+        The term weight is damped logarithmically.
         """
-        for vector in post.vectors:
+        documents: Dict[str, dict] = {}
+        for vector in Vector.deduplicate(post.vectors):
             if vector.is_known():
-                document: dict = {
+                documents[vector.word] = {
                     "vector": vector.to_list(),
                     "keyword": vector.word,
                     "slug": post.slug,
+                    "weight": 1.0 + math.log(max(1.0, vector.weight)),
                 }
-                doc_id: str = f'{vector.word}_{post.slug}'[:self.MAX_DOC_ID_SIZE]
-                self.post(f"{self.index}/_doc/{doc_id}", document)
+        return documents
 
-    def search(self, vectors: List[Vector], limit: int = 3) -> List[Post]:
+    def save(self, post: Post):
         """
         Indexes a Post in Elasticsearch.
+        Documents indexed before are deleted first, including those of
+        words the Post no longer has or with an older id format.
+        """
+        self.delete(post.slug)
+        for word, document in self.documents(post).items():
+            doc_id: str = f'{word}_{post.slug}'[:self.MAX_DOC_ID_SIZE]
+            self.post(f"{self.index}/_doc/{doc_id}", document)
+
+    def delete(self, slug: str, words: Optional[List[str]] = None):
+        """
+        Deletes the documents of a Post, or only some of its words.
+        """
+        filters: List[dict] = [{"term": {"slug": slug}}]
+        if words is not None:
+            filters.append({"terms": {"keyword": sorted(words)}})
+        self.post(f"{self.index}/_delete_by_query", {"query": {"bool": {"filter": filters}}})
+
+    def sync(self, post: Post, state: dict) -> dict:
+        """
+        Indexes only the documents of a Post that changed since the last sync.
+        Returns the new sync state of the Post.
+        """
+        hashes: Dict[str, str] = {}
+        documents: Dict[str, dict] = self.documents(post)
+        for word, document in documents.items():
+            hashes[word] = hashlib.sha1(json.dumps(document, sort_keys=True).encode('utf-8')).hexdigest()
+        digest: str = hashlib.sha1(json.dumps(hashes, sort_keys=True).encode('utf-8')).hexdigest()
+        if state.get('hash') == digest:
+            return state
+        if not state:
+            self.delete(post.slug)  # Documents indexed before the first sync.
+        previous: Dict[str, str] = state.get('words', {})
+        for word in sorted(hashes):
+            if previous.get(word) != hashes[word]:
+                doc_id: str = f'{word}_{post.slug}'[:self.MAX_DOC_ID_SIZE]
+                self.post(f"{self.index}/_doc/{doc_id}", documents[word])
+        removed: List[str] = [word for word in previous if word not in hashes]
+        if removed:
+            self.delete(post.slug, removed)
+        return {"hash": digest, "words": hashes}
+
+    def rank(self, vectors: List[Vector], deadline: Optional[float] = None) -> Dict[str, float]:
+        """
+        Scores the posts in this index against a list of vectors.
         """
         assert len(vectors) <= self.MAX_SEARCH_SIZE, "Maximum amount of search words reached!"
 
         # Querying Elastisearch with Painless script.
         script: str = """
+            double weight = 1.0;
+            if (doc.containsKey('weight') && doc['weight'].size() > 0) {
+                weight = doc['weight'].value;
+            }
             double score = 0;
             for (int i = 0; i < params.query_vectors.length; i++) {
                 double similarity = 1.0 + cosineSimilarity(params.query_vectors[i], 'vector');
                 score += similarity;
             }
-            return score;
+            return weight * score;
         """
         print('Script:', script)
         painless: str = ''
@@ -154,7 +214,7 @@ class Cluster:
                 }
             }
         }
-        response: dict = self.post(f"{self.index}/_search", query)
+        response: dict = self.post(f"{self.index}/_search", query, deadline=deadline)
 
         # Grouping hits by post slug.
         hits: List[dict] = response['hits']['hits']
@@ -168,13 +228,31 @@ class Cluster:
             scores_by_slug[slug].append(score)
         print(json.dumps(scores_by_slug, indent=4))
 
-        # Weighted average score.
+        # Mean of the top K hits, K being the number of query vectors,
+        # so that a post can't win by the number of its matching terms.
+        size: int = max(1, len(query["query"]["script_score"]["script"]["params"]["query_vectors"]))
         relevance_by_slug: Dict[str, float] = {}
         for slug in scores_by_slug:
-            size: int = len(scores_by_slug[slug])
-            total: int = sum(scores_by_slug[slug])
-            relevance_by_slug[slug] = size * total / size
+            top: List[float] = sorted(scores_by_slug[slug], reverse=True)[:size]
+            relevance_by_slug[slug] = sum(top) / size
         print(json.dumps(relevance_by_slug, indent=4))
+        return relevance_by_slug
+
+    def load(self, slug: str, score: float) -> Post:
+        """
+        Loads a search hit from the cache of this index.
+        """
+        post: Post = Post.load(Cache(slug, self.cache_dir).load())
+        post.score = score
+        post.index = self.index
+        post.cache_dir = self.cache_dir or Cache.PATH
+        return post
+
+    def search(self, vectors: List[Vector], limit: int = 3, deadline: Optional[float] = None) -> List[Post]:
+        """
+        Searches for Posts in Elasticsearch.
+        """
+        relevance_by_slug: Dict[str, float] = self.rank(vectors, deadline=deadline)
 
         # Fetching top posts.
         top_slugs: List[str] = [
@@ -185,6 +263,6 @@ class Cluster:
 
         # Load Post from the database.
         return [
-            Post.load(Cache(slug).load())
+            self.load(slug, relevance_by_slug[slug])
             for slug in top_slugs
         ]
@@ -0,0 +1,74 @@
+from typing import List, Optional
+from .post import Post
+from .tokenizer import Tokenizer
+
+
+class Context:
+    """
+    Token-budget-aware context packer.
+    """
+
+    FIELDS: List[str] = ["summary", "goal", "keywords"]
+
+    def __init__(self, budget: int):
+        """
+        Context constructor.
+        """
+        self.budget: int = budget
+        self.tokens: int = 0
+        self.lines: List[str] = []
+        self.posts: List[Post] = []
+
+    @property
+    def remaining(self) -> int:
+        """
+        Remaining tokens getter.
+        """
+        return self.budget - self.tokens
+
+    def reserve(self, text: str) -> int:
+        """
+        Reserves tokens for a fixed part of the prompt.
+        """
+        tokens: int = Tokenizer.count(text)
+        self.tokens += tokens
+        return tokens
+
+    @classmethod
+    def describe(cls, post: Post, field: str) -> Optional[str]:
+        """
+        Describes a Post using one of its fields.
+        """
+        if field == "summary" and post.summary:
+            description: str = f"is summarized as: '{post.summary}'"
+        elif field == "goal" and post.goal:
+            description: str = f"has the following goal: '{post.goal}'"
+        elif field == "keywords" and post.keywords:
+            description: str = f"is about: '{', '.join(post.keywords)}'"
+        else:
+            return None
+        return ", ".join([
+            f"The blog post titled: '{post.title}'",
+            description,
+            f"and you can read it in the following link: '{post.url}'",
+        ])
+
+    def pack(self, posts: List[Post]) -> 'Context':
+        """
+        Greedily fills the context with the most relevant posts.
+        Each post uses the first of its fields that fits in the budget.
+        """
+        for post in sorted(posts, key=lambda post: -1 * post.score):
+            for field in self.FIELDS:
+                line: Optional[str] = self.describe(post, field)
+                if line is None:
+                    continue
+                tokens: int = Tokenizer.count(line + "\n")
+                if tokens <= self.remaining:
+                    print('Context:', post.slug, field, tokens)
+                    self.lines.append(line)
+                    self.posts.append(post)
+                    self.tokens += tokens
+                    break
+        print('Tokens:', self.tokens, '/', self.budget)
+        return self
@@ -0,0 +1,34 @@
+import time
+
+
+class Deadline:
+    """
+    Time budget of a request.
+    """
+
+    def __init__(self, budget: float):
+        """
+        Deadline constructor.
+        """
+        self.budget: float = budget
+        self.start: float = time.monotonic()
+
+    @property
+    def at(self) -> float:
+        """
+        Absolute time.monotonic() value at which the budget is exhausted.
+        """
+        return self.start + self.budget
+
+    @property
+    def remaining(self) -> float:
+        """
+        Seconds left in the budget.
+        """
+        return max(0.0, self.at - time.monotonic())
+
+    def split(self, share: float) -> float:
+        """
+        Absolute deadline of a stage that may use a share of the remaining budget.
+        """
+        return time.monotonic() + self.remaining * share
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Tuple, Optional
+from .cluster import Cluster
+from .vector import Vector
+from .post import Post
+
+
+class Federation:
+    """
+    Fan-out search across several Elasticsearch indexes.
+    """
+
+    def __init__(self):
+        """
+        Lazy constructor.
+        """
+        self.clusters: List[Cluster] = []
+
+    def add(self, cluster: Cluster, index: str, cache_dir: str) -> Cluster:
+        """
+        Adds an index, reusing the connection settings of a cluster.
+        """
+        shard: Cluster = Cluster()
+        shard.protocol = cluster.protocol
+        shard.hostname = cluster.hostname
+        shard.port = cluster.port
+        shard.index = index
+        shard.cache_dir = cache_dir
+        self.clusters.append(shard)
+        return shard
+
+    @classmethod
+    def parse(cls, cluster: Cluster, indexes: str) -> 'Federation':
+        """
+        Builds a Federation from a comma separated list of 'index:cache_dir' pairs.
+        """
+        federation: 'Federation' = cls()
+        for pair in indexes.split(','):
+            if pair.strip():
+                index, _, cache_dir = pair.strip().partition(':')
+                federation.add(cluster, index, cache_dir)
+        return federation
+
+    def search(self, vectors: List[Vector], limit: int = 3, deadline: Optional[float] = None) -> List[Post]:
+        """
+        Searches all indexes concurrently and merges the results in a single ranking.
+        All indexes are scored by the same script in the same vector space,
+        so their scores are merged as they are.
+        Failing indexes are skipped, unless all of them fail.
+        """
+        if not self.clusters:
+            return []
+        for vector in vectors:
+            vector.array  # Vectorizing once, before fanning out.
+        rankings: List[Dict[str, float]] = []
+        errors: List[Exception] = []
+        with ThreadPoolExecutor(max_workers=len(self.clusters)) as executor:
+            futures: List[Future] = [
+                executor.submit(cluster.rank, vectors, deadline=deadline)
+                for cluster in self.clusters
+            ]
+            for cluster, future in zip(self.clusters, futures):
+                try:
+                    rankings.append(future.result())
+                except Exception as error:
+                    print('Failed:', cluster.index, repr(error))
+                    rankings.append({})
+                    errors.append(error)
+        if len(errors) == len(self.clusters):
+            raise errors[0]
+        hits: List[Tuple[float, int, str]] = []
+        for position, ranking in enumerate(rankings):
+            for slug, score in ranking.items():
+                hits.append((score, position, slug))
+        top_hits: List[Tuple[float, int, str]] = sorted(hits, key=lambda x: (-1 * x[0], x[1], x[2]))[:limit]
+        print('Top:', top_hits)
+        return [
+            self.clusters[position].load(slug, score)
+            for score, position, slug in top_hits
+        ]
@@ -1,7 +1,9 @@
 import json
-from typing import List
+from typing import List, Optional, Tuple
 import requests
 from .post import Post
+from .context import Context
+from .transport import Transport
 
 
 class Gpt:
@@ -12,10 +14,18 @@ class Gpt:
     API_KEY: str = ""
     TEMPERATURE: float = 0.5
     URL: str = "https://api.openai.com/v1/completions"
-    MAX_CONTEXT_DOCUMENTS_SIZE: int = 3
-    MAX_CONTEXT_SUMMARY_SIZE: int = 50
+    MAX_CONTEXT_CANDIDATES: int = 20
+    MAX_PROMPT_TOKENS: int = 500
+    TIMEOUT: float = 60.0
 
-    def post(self, prompt: str, limit: int = 50):
+    def __init__(self):
+        """
+        Lazy constructor.
+        """
+        self.context: Context = Context(self.MAX_PROMPT_TOKENS)
+        self.usage: dict = {}
+
+    def post(self, prompt: str, limit: int = 50, deadline: Optional[float] = None):
         """
         Sends a post request to the GPT API.
         """
@@ -32,34 +42,50 @@ class Gpt:
             # "stop": ["\n", ".", "!", "?"]
         }
         print(json.dumps(payload, indent=4, sort_keys=True))
-        response: requests.Response = requests.post(self.URL, headers=headers, json=payload)
+        response: requests.Response = Transport.post(self.URL, headers=headers, json=payload, timeout=self.TIMEOUT, deadline=deadline)
         print(response.status_code, response.reason)
         assert response.status_code == 200, response.text
         data: Union[dict, list] = response.json()
         print(json.dumps(data, indent=4, sort_keys=True))
+        self.usage = data.get('usage', {})
         text: str = data['choices'][0]['text'].strip()
         print(text)
         return text
 
-    def ask(self, question: str, context: List[Post], limit: int = 50) -> str:
+    @classmethod
+    def frame(cls, question: str) -> Tuple[str, str]:
+        """
+        Fixed text around the injected context.
+        """
+        header: str = "Digest the following summarized blog posts in a way that you can answer questions based on them, and so that you can suggest reading them:"
+        footer: str = f"Now, answer the following question in a separate paragraph (but always referring to topics summarized above) and, in another paragraph give me a reference (the title and the link) to only one of those blog posts explaining why I should read it: '{question}'"
+        return header, footer
+
+    def pack(self, question: str, context: List[Post]) -> Context:
+        """
+        Packs the most relevant candidate posts into the prompt token budget.
+        """
+        header, footer = self.frame(question)
+        self.context = Context(self.MAX_PROMPT_TOKENS)
+        self.context.reserve(f"{header}\n{footer}")
+        self.context.pack(context)
+        return self.context
+
+    def ask(self, question: str, context: List[Post], limit: int = 50, deadline: Optional[float] = None) -> str:
         """
         Asks a question to the GPT API with Context Injection.
         """
+        header, footer = self.frame(question)
+        self.pack(question, context)
         prompt: str = "\n".join([
-            "Digest the following summarized blog posts in a way that you can answer questions based on them, and so that you can suggest reading them:",
-            "\n".join([
-                "m ".join([
-                    f"The blog post titled: '{post.title}'",
-                    f"is summarized as: '{post.summary[:self.MAX_CONTEXT_SUMMARY_SIZE]}'",
-                    f"and you can read it in the following link: '{post.url}'",
-                ])
-                for post in context[:self.MAX_CONTEXT_DOCUMENTS_SIZE]
-            ]),
-            f"Now, answer the following question in a separate paragraph (but always referring to topics summarized above) and, in another paragraph give me a reference (the title and the link) to only one of those blog posts explaining why I should read it: '{question}'",
+            header,
+            "\n".join(self.context.lines),
+            footer,
         ])
         answer: str = self.post(
             prompt=prompt,
             limit=limit,
+            deadline=deadline,
         )
         print('Answer:', answer)
         return answer
@@ -86,6 +112,61 @@ class Gpt:
         print('Main idea:', goal)
         return goal
 
+    def enrich(self, text: str, limit: int = 600) -> dict:
+        """
+        Extracts the summary, goal and keywords of a text in a single request.
+        Raises ValueError if the response is not the expected JSON object.
+        """
+        response: str = self.post(
+            prompt="\n".join([
+                'Reply only with a JSON object with the following keys, describing the text below:',
+                '"summary": a summary of the text in at most 60 words,',
+                '"goal": the goal of what is described in the text and how other people could benefit from it, in at most 40 words,',
+                '"keywords": a list of the 20 most important words, entities, and their synonims in the text.',
+                f'Text: {text}',
+            ]),
+            limit=limit,
+        )
+        enrichment: dict = self.parse_enrichment(response)
+        print('Enrichment:', enrichment)
+        return enrichment
+
+    @classmethod
+    def parse_enrichment(cls, text: str) -> dict:
+        """
+        Parses and validates the JSON object returned by Gpt.enrich.
+        """
+        start: int = text.find('{')
+        end: int = text.rfind('}')
+        if start < 0 or end < start:
+            raise ValueError(f"No JSON object found: {text}")
+        try:
+            data: dict = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid JSON object: {text}") from error
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid JSON object: {text}")
+        summary: str = data.get('summary')
+        goal: str = data.get('goal')
+        keywords: List[str] = data.get('keywords')
+        if isinstance(keywords, str):
+            keywords = keywords.split(',')
+        if not isinstance(summary, str) or not summary.strip():
+            raise ValueError(f"Invalid summary: {text}")
+        if not isinstance(goal, str) or not goal.strip():
+            raise ValueError(f"Invalid goal: {text}")
+        if not isinstance(keywords, list) or not all([isinstance(keyword, str) for keyword in keywords]):
+            raise ValueError(f"Invalid keywords: {text}")
+        return {
+            "summary": summary.strip(),
+            "goal": goal.strip(),
+            "keywords": [
+                keyword.strip()
+                for keyword in keywords
+                if keyword.strip()
+            ],
+        }
+
     def get_keywords(self, text: str, limit: int = 20) -> List[str]:
         """
         Summarizes a text using the GPT API.
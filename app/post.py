@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Dict, Callable
 from slugify import slugify
 from .parser import Parser
 from .cache import Cache
@@ -10,6 +10,12 @@ class Post:
     Wordpress Blog Post.
     """
 
+    FIELD_WEIGHTS: Dict[str, float] = {
+        "keywords": 2.0,
+        "summary": 1.0,
+        "goal": 1.0,
+    }
+
     def __init__(self):
         """
         Lazy constructor.
@@ -24,6 +30,9 @@ class Post:
         self.goal: str = ''
         self.keywords: List[str] = []
         self.vectors: List[Vector] = []
+        self.score: float = 0.0
+        self.index: str = ''
+        self.cache_dir: str = ''
 
     @property
     def slug(self) -> str:
@@ -41,6 +50,22 @@ class Post:
         parser.feed(self.content)
         return parser.data
 
+    def vectorize(self, vectorizer: Callable[[List[str]], List[Vector]]):
+        """
+        Vectorizes the keywords, summary and goal of the post.
+        Each word is kept once, weighted by its frequency and source field.
+        """
+        vectors: List[Vector] = []
+        for field, terms in (
+            ("keywords", self.keywords),
+            ("summary", self.summary.split()),
+            ("goal", self.goal.split()),
+        ):
+            for vector in vectorizer(terms):
+                vector.weight = self.FIELD_WEIGHTS[field]
+                vectors.append(vector)
+        self.vectors = Vector.deduplicate(vectors)
+
     def to_json(self) -> dict:
         """
         JSON serializer.
@@ -69,11 +94,14 @@ class Post:
         """
         return {
             "title": self.title,
+            "slug": self.slug,
             "date": self.date,
             "image_url": self.image_url,
             "url": self.url,
             "summary": self.summary,
             "keywords": self.keywords,
+            "index": self.index,
+            "cache_dir": self.cache_dir,
         }
 
     @classmethod
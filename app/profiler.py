@@ -0,0 +1,133 @@
+import os
+import sys
+import inspect
+import functools
+import threading
+from collections import Counter
+from typing import Optional, List, Callable
+
+
+class Profiler:
+    """
+    Low-overhead sampling profiler.
+    A background thread samples the stack of the profiled thread at a fixed
+    interval, and writes collapsed stacks (for flamegraph.pl or speedscope)
+    plus a summary of the hottest functions.
+    Child processes, such as vectorize workers, are not profiled.
+    """
+
+    INTERVAL: float = 0.005
+    TOP: int = 20
+
+    def __init__(self, path: str, thread_id: Optional[int] = None):
+        """
+        Profiler constructor.
+        Profiling is disabled if the path is empty.
+        """
+        self.path: str = path
+        self.thread_id: int = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.stopped: threading.Event = threading.Event()
+        self.sampler: Optional[threading.Thread] = None
+
+    @classmethod
+    def profile(cls, function: Callable) -> Callable:
+        """
+        Adds a 'profile' path option to a command.
+        All options become keyword-only, so the command line parser passes
+        them by name. The 'profile' option is listed first, so it never takes
+        over the short flag of an existing option.
+        """
+        @functools.wraps(function)
+        def wrapper(*args, profile: str = "", **kwargs):
+            with cls(profile):
+                return function(*args, **kwargs)
+        signature: inspect.Signature = inspect.signature(function)
+        wrapper.__signature__ = signature.replace(parameters=[
+            inspect.Parameter("profile", inspect.Parameter.KEYWORD_ONLY, default=""),
+            *[
+                parameter.replace(kind=inspect.Parameter.KEYWORD_ONLY)
+                for parameter in signature.parameters.values()
+            ],
+        ])
+        return wrapper
+
+    def __enter__(self) -> 'Profiler':
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @classmethod
+    def label(cls, frame) -> str:
+        """
+        Describes a stack frame.
+        """
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def sample(self):
+        """
+        Samples the profiled thread until stopped.
+        """
+        while not self.stopped.wait(self.INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(self.label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        """
+        Starts sampling.
+        """
+        if self.path and self.sampler is None:
+            self.sampler = threading.Thread(target=self.sample, daemon=True)
+            self.sampler.start()
+
+    def stop(self):
+        """
+        Stops sampling and writes the profile.
+        """
+        if self.sampler is None:
+            return
+        self.stopped.set()
+        self.sampler.join()
+        self.sampler = None
+        self.save()
+
+    def summarize(self) -> str:
+        """
+        Lists the functions with the most samples, on top of the stack (self) and anywhere in it (total).
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames: List[str] = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        samples: int = max(1, sum(self.stacks.values()))
+        lines: List[str] = [f"Samples: {sum(self.stacks.values())} every {self.INTERVAL}s"]
+        for title, counter in (("Self", own), ("Total", total)):
+            lines.append("")
+            lines.append(f"{title}:")
+            for frame, count in counter.most_common(self.TOP):
+                lines.append(f"{100 * count / samples:6.2f}% {count:8d} {frame}")
+        return "\n".join(lines)
+
+    def save(self):
+        """
+        Writes the collapsed stacks and the hot function summary.
+        """
+        with open(self.path, "w", encoding='utf-8') as file_handler:
+            for stack, count in sorted(self.stacks.items()):
+                file_handler.write(f"{stack} {count}\n")
+        summary: str = self.summarize()
+        with open(f"{self.path}.txt", "w", encoding='utf-8') as file_handler:
+            file_handler.write(summary + "\n")
+        print('Profile:', self.path)
+        print(summary)
@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Callable
+import numpy as np
+
+
+class Replay:
+    """
+    Replays captured /ask traffic and compares the results.
+    Shed and failed requests are replayed too, to keep the recorded arrival rate.
+    """
+
+    PERCENTILES: List[int] = [50, 90, 99]
+
+    def __init__(self, records: List[dict], speed: float = 1.0, concurrency: int = 8):
+        """
+        Replay constructor.
+        A speed of 2 replays twice as fast as recorded, and 0 as fast as possible.
+        """
+        self.records: List[dict] = sorted(records, key=lambda record: record["time"])
+        self.speed: float = speed
+        self.concurrency: int = concurrency
+        self.results: List[dict] = []
+
+    def send(self, send: Callable[[dict], dict], record: dict, scheduled: float) -> dict:
+        """
+        Sends a single captured request and measures it.
+        Latency is measured from the time the request was scheduled, so time
+        spent waiting for a free sender counts too (no coordinated omission).
+        """
+        try:
+            response: dict = send(record)
+            error: str = ''
+        except Exception as exception:
+            response: dict = {}
+            error: str = repr(exception)
+        return {
+            "question": record["question"],
+            "latency": time.monotonic() - scheduled,
+            "expected": record.get("slugs", []),
+            "slugs": response.get("slugs", []),
+            "expected_status": record.get("status", 200),
+            "status": response.get("status", 0),
+            "degraded": bool(response.get("degraded")),
+            "error": error,
+        }
+
+    def run(self, send: Callable[[dict], dict]) -> 'Replay':
+        """
+        Replays all records at their recorded pace, scaled by the speed.
+        """
+        futures: List[Future] = []
+        origin: float = self.records[0]["time"] if self.records else 0.0
+        start: float = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for record in self.records:
+                scheduled: float = start
+                if self.speed > 0:
+                    scheduled = start + (record["time"] - origin) / self.speed
+                    delay: float = scheduled - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                futures.append(executor.submit(self.send, send, record, scheduled))
+        self.results = [future.result() for future in futures]
+        return self
+
+    def report(self) -> dict:
+        """
+        Summarizes latencies and result differences.
+        """
+        latencies: np.array = np.array([result["latency"] for result in self.results] or [0.0])
+        diffs: List[dict] = [
+            {"question": result["question"], "expected": result["expected"], "slugs": result["slugs"]}
+            for result in self.results
+            if not result["error"] and result["status"] == result["expected_status"] == 200
+            and result["slugs"] != result["expected"]
+        ]
+        report: dict = {
+            "requests": len(self.results),
+            "errors": len([result for result in self.results if result["error"]]),
+            "shed": len([result for result in self.results if result["status"] == 503]),
+            "recorded_shed": len([result for result in self.results if result["expected_status"] == 503]),
+            "status_changes": len([result for result in self.results if result["status"] != result["expected_status"]]),
+            "degraded": len([result for result in self.results if result["degraded"]]),
+            "latency": {
+                "mean": float(latencies.mean()),
+                "max": float(latencies.max()),
+            },
+            "diffs": len(diffs),
+            "examples": diffs[:10],
+        }
+        for percentile in self.PERCENTILES:
+            report["latency"][f"p{percentile}"] = float(np.percentile(latencies, percentile))
+        return report
@@ -0,0 +1,70 @@
+from typing import List, Dict
+import numpy as np
+from .cache import Cache
+from .post import Post
+from .vector import Vector
+
+
+class Shard:
+    """
+    Subset of cached posts vectorized by a worker process.
+    """
+
+    def __init__(self, path: str, keys: List[str]):
+        """
+        Shard constructor.
+        """
+        self.path: str = path
+        self.keys: List[str] = keys
+        self.delta: Dict[str, np.array] = {}
+        self.error: str = ''
+
+    @classmethod
+    def initialize(cls, oov: str):
+        """
+        Pool initializer.
+        """
+        Vector.OOV = oov
+
+    @classmethod
+    def split(cls, path: str, keys: List[str], size: int) -> List['Shard']:
+        """
+        Splits the sorted list of cache keys in contiguous shards.
+        """
+        keys: List[str] = sorted(keys)
+        step: int = max(1, -(-len(keys) // max(1, size)))
+        return [
+            cls(path, keys[start:start + step])
+            for start in range(0, len(keys), step)
+        ]
+
+    def vectorize(self) -> 'Shard':
+        """
+        Vectorizes the posts in this shard.
+        New words are kept in the shard delta instead of the SpaCy model.
+        Errors are kept too, so the delta of the posts already saved
+        still gets back to the parent process and can be learnt.
+        """
+        Cache.PATH = self.path
+        try:
+            for key in self.keys:
+                post: Post = Post.load(Cache(key).load())
+                print("Post:", post.date, post.title)
+                if not post.vectors:
+                    post.vectorize(lambda terms: Vector.embed(terms, self.delta))
+                    post.save()
+        except Exception as error:
+            print("Failed:", repr(error))
+            self.error = repr(error)
+        return self
+
+    @classmethod
+    def merge(cls, shards: List['Shard']) -> Dict[str, np.array]:
+        """
+        Merges the deltas of all shards.
+        New word vectors are seeded by the word, so all shards agree on them.
+        """
+        delta: Dict[str, np.array] = {}
+        for shard in shards:
+            delta.update(shard.delta)
+        return delta
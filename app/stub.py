@@ -0,0 +1,111 @@
+import gzip
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+import numpy as np
+from .cache import Cache
+from .cluster import Cluster
+from .post import Post
+
+
+class Stub(BaseHTTPRequestHandler):
+    """
+    Local HTTP stub of an upstream service.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length: int = int(self.headers.get('Content-Length') or 0)
+        body: bytes = self.rfile.read(length)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        payload: dict = json.loads(body or b'{}')
+        body: bytes = json.dumps(self.respond(payload)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def respond(self, payload: dict) -> dict:
+        """
+        Builds the response to a request.
+        """
+        raise NotImplementedError()
+
+    @classmethod
+    def start(cls) -> ThreadingHTTPServer:
+        """
+        Serves the stub on a random local port, in a daemon thread.
+        """
+        server: ThreadingHTTPServer = ThreadingHTTPServer(('127.0.0.1', 0), cls)
+        thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        print('Stub:', cls.__name__, server.server_address)
+        return server
+
+
+class SearchStub(Stub):
+    """
+    Elasticsearch stub that scores the cached posts in memory,
+    the same way as the Painless script of Cluster.rank.
+    """
+
+    slugs: List[str] = []
+    weights: np.array = np.zeros(0)
+    matrix: np.array = np.zeros((0, 0))
+
+    @classmethod
+    def load(cls, cluster: Cluster):
+        """
+        Loads the term documents of every cached post.
+        """
+        slugs: List[str] = []
+        weights: List[float] = []
+        vectors: List[List[float]] = []
+        for cache in Cache.all():
+            post: Post = Post.load(cache.load())
+            for document in cluster.documents(post).values():
+                slugs.append(document["slug"])
+                weights.append(document["weight"])
+                vectors.append(document["vector"])
+        matrix: np.array = np.array(vectors, dtype=float)
+        if len(matrix):
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        cls.slugs, cls.weights, cls.matrix = slugs, np.array(weights), matrix
+
+    def respond(self, payload: dict) -> dict:
+        script: dict = payload["query"]["script_score"]["script"]
+        queries: np.array = np.array(script["params"]["query_vectors"], dtype=float)
+        if not len(queries) or not len(self.matrix):
+            return {"hits": {"hits": []}}
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores: np.array = self.weights * (1.0 + self.matrix @ queries.T).sum(axis=1)
+        top: np.array = np.argsort(-1 * scores, kind="stable")[:payload.get("size", 10)]
+        return {
+            "hits": {
+                "hits": [
+                    {"_score": float(scores[position]), "fields": {"slug": [self.slugs[position]]}}
+                    for position in top
+                ]
+            }
+        }
+
+
+class CompletionsStub(Stub):
+    """
+    GPT completions stub that answers with a canned text after a fixed delay.
+    """
+
+    DELAY: float = 0.0
+
+    def respond(self, payload: dict) -> dict:
+        time.sleep(self.DELAY)
+        return {
+            "choices": [{"text": "Stub answer."}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
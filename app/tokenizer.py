@@ -0,0 +1,45 @@
+import math
+from typing import List
+import regex
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class Tokenizer:
+    """
+    Local GPT token counter.
+    Uses tiktoken when installed, otherwise a conservative estimate
+    based on the GPT pre-tokenization pattern.
+    """
+
+    ENCODING: str = "p50k_base"
+    CHARACTERS_PER_TOKEN: int = 4
+    PATTERN: 'regex.Pattern' = regex.compile(
+        r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+"""
+    )
+
+    @classmethod
+    @property
+    def encoding(cls) -> 'tiktoken.Encoding':
+        """
+        Loads the tiktoken encoding, if available.
+        """
+        if not hasattr(cls, '_encoding'):
+            cls._encoding = tiktoken.get_encoding(cls.ENCODING) if tiktoken else None
+        return cls._encoding
+
+    @classmethod
+    def count(cls, text: str) -> int:
+        """
+        Counts the number of tokens in a text.
+        """
+        if cls.encoding is not None:
+            return len(cls.encoding.encode(text))
+        pieces: List[str] = cls.PATTERN.findall(text)
+        return sum([
+            math.ceil(len(piece.strip() or piece) / cls.CHARACTERS_PER_TOKEN)
+            for piece in pieces
+        ])
@@ -0,0 +1,225 @@
+import os
+import gzip
+import json
+import time
+import random
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised when an upstream circuit breaker is open.
+    """
+
+
+class Breaker:
+    """
+    Circuit breaker of a single upstream.
+    """
+
+    THRESHOLD: int = 5
+    COOLDOWN: float = 30.0
+
+    def __init__(self, host: str):
+        """
+        Breaker constructor.
+        """
+        self.host: str = host
+        self.failures: int = 0
+        self.opened_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        """
+        Evaluates if a request can be sent upstream.
+        Once the cooldown expires, requests are let through again (half-open).
+        """
+        if self.opened_at is None:
+            return True
+        return time.monotonic() - self.opened_at >= self.COOLDOWN
+
+    def success(self):
+        """
+        Closes the circuit.
+        """
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self):
+        """
+        Opens the circuit after too many consecutive failed requests.
+        """
+        self.failures += 1
+        if self.failures >= self.THRESHOLD:
+            print('Circuit open:', self.host)
+            self.opened_at = time.monotonic()
+
+
+class Transport:
+    """
+    Shared HTTP transport with keep-alive pools, compression, timeouts, retries and circuit breakers.
+    """
+
+    CONNECT_TIMEOUT: float = 3.05
+    READ_TIMEOUT: float = 30.0
+    MAX_RETRIES: int = 3
+    BACKOFF: float = 0.5
+    MAX_BACKOFF: float = 8.0
+    POOL_SIZE: int = 10
+    RETRY_STATUSES: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    REJECT_STATUSES: Tuple[int, ...] = (429, 503)
+
+    _session: Optional[requests.Session] = None
+    _pid: Optional[int] = None
+    _breakers: Dict[str, Breaker] = {}
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """
+        Returns the Session of the current process.
+        Pools are not shared with forked workers.
+        """
+        if cls._session is None or cls._pid != os.getpid():
+            session: requests.Session = requests.Session()
+            adapter: HTTPAdapter = HTTPAdapter(pool_connections=cls.POOL_SIZE, pool_maxsize=cls.POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            cls._session = session
+            cls._pid = os.getpid()
+            cls._breakers = {}
+        return cls._session
+
+    @classmethod
+    def breaker(cls, url: str) -> Breaker:
+        """
+        Returns the circuit breaker of an upstream.
+        """
+        host: str = urlparse(url).netloc
+        if host not in cls._breakers:
+            cls._breakers[host] = Breaker(host)
+        return cls._breakers[host]
+
+    @classmethod
+    def backoff(cls, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Full-jitter exponential backoff, honouring Retry-After.
+        """
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(cls.MAX_BACKOFF, float(response.headers["Retry-After"]))
+        return random.uniform(0, min(cls.MAX_BACKOFF, cls.BACKOFF * 2 ** attempt))
+
+    @classmethod
+    def unsent(cls, error: requests.RequestException) -> bool:
+        """
+        Evaluates if a failed request never reached the upstream,
+        because the connection could not be established.
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason: Optional[Exception] = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+    @classmethod
+    def rejected(cls, response: requests.Response) -> bool:
+        """
+        Evaluates if the upstream rejected a request without processing it.
+        """
+        return response.status_code in cls.REJECT_STATUSES and "Retry-After" in response.headers
+
+    @classmethod
+    def request(
+        cls,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        idempotent: bool = False,
+        compress: bool = False,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Sends an HTTP request, retrying transient failures.
+        The deadline is an absolute time.monotonic() value that bounds
+        every attempt and the backoff between them.
+        Non-idempotent requests are only retried if the upstream never got
+        them: connection errors, or a 429/503 rejection with Retry-After.
+        Compressed requests gzip their JSON body.
+        """
+        if compress and "json" in kwargs:
+            kwargs["data"] = gzip.compress(json.dumps(kwargs.pop("json")).encode('utf-8'))
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+            }
+        session: requests.Session = cls.session()
+        breaker: Breaker = cls.breaker(url)
+        attempt: int = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open: {breaker.host}")
+            read_timeout: float = timeout or cls.READ_TIMEOUT
+            if deadline is not None:
+                read_timeout = min(read_timeout, deadline - time.monotonic())
+                if read_timeout <= 0:
+                    raise requests.Timeout(f"Deadline exceeded: {method} {url}")
+            try:
+                response: requests.Response = session.request(
+                    method=method,
+                    url=url,
+                    timeout=(min(cls.CONNECT_TIMEOUT, read_timeout), read_timeout),
+                    **kwargs,
+                )
+            except (requests.ConnectionError, requests.Timeout) as error:
+                delay: float = cls.backoff(attempt)
+                retryable: bool = idempotent or cls.unsent(error)
+                if not retryable or attempt >= cls.MAX_RETRIES or not cls.fits(delay, deadline):
+                    breaker.failure()
+                    raise
+                print('Retry:', method, url, error)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if response.status_code not in cls.RETRY_STATUSES:
+                breaker.success()
+                return response
+            delay: float = cls.backoff(attempt, response)
+            retryable: bool = idempotent or cls.rejected(response)
+            if not retryable or attempt >= cls.MAX_RETRIES or not cls.fits(delay, deadline):
+                if response.status_code != 429:
+                    breaker.failure()
+                return response
+            print('Retry:', method, url, response.status_code, response.reason)
+            time.sleep(delay)
+            attempt += 1
+
+    @classmethod
+    def fits(cls, delay: float, deadline: Optional[float]) -> bool:
+        """
+        Evaluates if there is time left to retry after a delay.
+        """
+        return deadline is None or time.monotonic() + delay < deadline
+
+    @classmethod
+    def get(cls, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request.
+        """
+        return cls.request("GET", url, **kwargs)
+
+    @classmethod
+    def post(cls, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a POST request.
+        """
+        return cls.request("POST", url, **kwargs)
+
+    @classmethod
+    def put(cls, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a PUT request.
+        """
+        return cls.request("PUT", url, **kwargs)
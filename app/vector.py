@@ -1,6 +1,7 @@
 import os
 import json
-from typing import Optional, List, Union
+import hashlib
+from typing import Optional, List, Union, Dict
 import numpy as np
 import spacy
 
@@ -23,6 +24,10 @@ class Vector:
 
     PATH: str = os.path.join(os.sep, 'tmp', 'en_benji_custom')
     DEFAULT: str = 'en_core_web_md'
+    OOV: str = 'random'
+    MIN_NGRAM_SIZE: int = 3
+    MAX_NGRAM_SIZE: int = 5
+    HASHES_PER_NGRAM: int = 4
 
     def __init__(self):
         """
@@ -30,6 +35,7 @@ class Vector:
         """
         self._word: str = ''
         self._array: Optional[np.array] = None
+        self.weight: float = 1.0
 
     @classmethod
     @property
@@ -61,6 +67,8 @@ class Vector:
         """
         if self._array is None and self.word:
             self._array = self.model(self.word).vector
+            if self.OOV == 'hashed' and not self._array.any():
+                self._array = self.generate_hashed_vector(self.word, len(self._array))
         return self._array
 
     @array.setter
@@ -101,6 +109,7 @@ class Vector:
         return {
             "word": self.word,
             "array": json.dumps(self.array, cls=NumpyArrayEncoder),
+            "weight": self.weight,
         }
 
     @classmethod
@@ -111,6 +120,7 @@ class Vector:
         vector: 'Vector' = cls()
         vector.word = data.get('word', '')
         vector.array = np.array(json.loads(data.get('array', [])))
+        vector.weight = float(data.get('weight', 1.0))
         return vector
 
     @classmethod
@@ -129,29 +139,100 @@ class Vector:
                 vectors.append(vector)
         return vectors
 
+    @classmethod
+    def deduplicate(cls, vectors: List['Vector']) -> List['Vector']:
+        """
+        Merges repeated words into a single vector, adding up their weights.
+        """
+        vectors_by_word: Dict[str, 'Vector'] = {}
+        for vector in vectors:
+            if vector.word not in vectors_by_word:
+                unique: 'Vector' = cls()
+                unique.word = vector.word
+                unique.array = vector.array
+                unique.weight = 0.0
+                vectors_by_word[vector.word] = unique
+            vectors_by_word[vector.word].weight += vector.weight
+        return list(vectors_by_word.values())
+
     @classmethod
     def train(cls, terms: Union[str, List[str]]) -> List['Vector']:
         """
         Trains SpaCy with new words.
+        The model is not saved to disk until Vector.save() is called.
         https://spacy.io/api/vocab#set_vector
         """
         vectors: List['Vector'] = cls.to_vectors(terms)
         for vector in vectors:
             if not vector.is_known():
-                vector.array = cls.generate_random_vector()
+                vector.array = cls.generate_random_vector(vector.word)
                 cls.model.vocab.set_vector(vector.word, vector.array)
-        Vector.model.to_disk(Vector.PATH)
         return vectors
 
     @classmethod
-    def generate_random_vector(cls) -> np.array:
+    def embed(cls, terms: Union[str, List[str]], delta: Dict[str, np.array]) -> List['Vector']:
+        """
+        Vectorizes new words without mutating the SpaCy vocabulary.
+        New words are collected in the delta so they can be learnt later.
+        """
+        vectors: List['Vector'] = cls.to_vectors(terms)
+        for vector in vectors:
+            if vector.word in delta:
+                vector.array = delta[vector.word]
+            elif not vector.is_known():
+                vector.array = cls.generate_random_vector(vector.word)
+                delta[vector.word] = vector.array
+        return vectors
+
+    @classmethod
+    def learn(cls, delta: Dict[str, np.array]):
+        """
+        Merges new words into the SpaCy vocabulary and saves the model once.
+        """
+        for word in sorted(delta):
+            cls.model.vocab.set_vector(word, delta[word])
+        cls.save()
+
+    @classmethod
+    def save(cls):
+        """
+        Saves the SpaCy model to disk.
+        """
+        cls.model.to_disk(cls.PATH)
+
+    @classmethod
+    def generate_random_vector(cls, word: str) -> np.array:
         """
         Generates a random vector for a new word.
+        The random generator is seeded with a hash of the word, so every
+        process gives the same vector to the same word.
         """
-        array: np.array = np.random.rand(cls.size, )
+        seed: int = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+        array: np.array = np.random.default_rng(seed).random(cls.size)
         array[0] = 3.14  # All unknowns together.
         return array
 
+    @classmethod
+    def generate_hashed_vector(cls, word: str, size: int) -> np.array:
+        """
+        Generates a deterministic vector for a new word by hashing
+        the word and its character n-grams (feature hashing).
+        """
+        padded: str = f"<{word}>"
+        grams: List[str] = [padded]
+        for length in range(cls.MIN_NGRAM_SIZE, cls.MAX_NGRAM_SIZE + 1):
+            grams.extend([
+                padded[start:start + length]
+                for start in range(len(padded) - length + 1)
+            ])
+        array: np.array = np.zeros(size)
+        for gram in grams:
+            digest: bytes = hashlib.blake2b(gram.encode('utf-8'), digest_size=4 * cls.HASHES_PER_NGRAM).digest()
+            for offset in range(0, len(digest), 4):
+                value: int = int.from_bytes(digest[offset:offset + 4], 'little')
+                array[(value >> 1) % size] += 1.0 if value & 1 else -1.0
+        return array / max(np.linalg.norm(array), 1e-12)
+
     def to_list(self) -> List[float]:
         """
         Casts the vector to a list of float numbers.
@@ -166,4 +247,4 @@ class Vector:
         """
         Determines if the vectorized word is known.
         """
-        return self.word and not isinstance(self.array, str) and self.array.any() and self.word in self.model.vocab
+        return self.word and not isinstance(self.array, str) and self.array.any() and (self.OOV == 'hashed' or self.word in self.model.vocab)
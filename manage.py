@@ -1,4 +1,7 @@
+import os
+import json
 import begin
+import multiprocessing
 from typing import List
 from app.cache import Cache
 from app.blog import Blog
@@ -6,9 +9,16 @@ from app.gpt import Gpt
 from app.post import Post
 from app.vector import Vector
 from app.cluster import Cluster
+from app.shard import Shard
+from app.federation import Federation
+from app.capture import Capture
+from app.replay import Replay
+from app.stub import SearchStub, CompletionsStub
+from app.profiler import Profiler
 
 
 @begin.subcommand
+@Profiler.profile
 def download(
     username="",
     password="",
@@ -34,13 +44,17 @@ def download(
 
 
 @begin.subcommand
+@Profiler.profile
 def summarize(
     cache_dir="data",
     gpt_api_key="",
     temperature=0.5,
+    combined=False,
 ):
     """
     Summarize posts using GPT.
+    In combined mode, the summary, keywords and goal are requested at once,
+    falling back to one request per field if the response is invalid.
     """
     Gpt.API_KEY = gpt_api_key
     Gpt.TEMPERATURE = float(temperature)
@@ -50,6 +64,15 @@ def summarize(
         post: Post = Post.load(cache.load())
         print("Post:", post.date, post.title)
         print(post.paragraphs)
+        if combined and not (post.summary and post.keywords and post.goal):
+            try:
+                enrichment: dict = gpt.enrich(" ".join(post.paragraphs))
+            except ValueError as error:
+                print("Fallback:", error)
+            else:
+                post.summary = post.summary or enrichment["summary"]
+                post.keywords = post.keywords or enrichment["keywords"]
+                post.goal = post.goal or enrichment["goal"]
         if not post.summary:
             post.summary = gpt.summarize(" ".join(post.paragraphs))
         if not post.keywords:
@@ -60,78 +83,175 @@ def summarize(
 
 
 @begin.subcommand
+@Profiler.profile
 def vectorize(
     cache_dir="data",
+    workers=1,
+    oov="random",
 ):
     """
     Vectorize posts using SpaCy.
+    Use more than one worker to shard posts across a process pool.
+    Use 'hashed' OOV vectors to avoid training and saving the SpaCy model.
     """
     Cache.PATH = cache_dir
-    for cache in Cache.all():
-        post: Post = Post.load(cache.load())
-        print("Post:", post.date, post.title)
-        print(post.paragraphs)
-        if not post.vectors:
-            post.vectors.extend(Vector.train(post.keywords))
-            post.vectors.extend(Vector.train(post.summary.split()))
-            post.vectors.extend(Vector.train(post.goal.split()))
-            post.save()
+    Vector.OOV = oov
+    if int(workers) > 1:
+        shards: List[Shard] = Shard.split(cache_dir, [cache.key for cache in Cache.all()], int(workers))
+        with multiprocessing.Pool(processes=int(workers), initializer=Shard.initialize, initargs=(oov, )) as pool:
+            shards = pool.map(Shard.vectorize, shards)
+        delta: dict = Shard.merge(shards)
+        if delta:
+            Vector.learn(delta)
+        errors: List[str] = [shard.error for shard in shards if shard.error]
+        assert not errors, errors
+        return
+    try:
+        for cache in Cache.all():
+            post: Post = Post.load(cache.load())
+            print("Post:", post.date, post.title)
+            print(post.paragraphs)
+            if not post.vectors:
+                post.vectorize(Vector.train)
+                post.save()
+    finally:
+        if Vector.OOV != 'hashed':
+            Vector.save()
 
 
 @begin.subcommand
+@Profiler.profile
 def index(
     hostname="localhost",
     protocol="https",
     port=9200,
     index="default",
     cache_dir="data",
+    incremental=False,
+    state_dir=".",
+    oov="random",
 ):
     """
     Indexes documents in Elasticsearch.
+    In incremental mode, only changed documents are indexed and stale
+    documents are deleted, using a sync state file kept in the state dir.
     """
     Cache.PATH = cache_dir
+    Vector.OOV = oov
     cluster: Cluster = Cluster()
     cluster.hostname = hostname
     cluster.port = int(port)
     cluster.protocol = protocol
     cluster.index = index
     cluster.init()
+    if not incremental:
+        for cache in Cache.all():
+            post: Post = Post.load(cache.load())
+            print(post.date, post.title)
+            cluster.save(post)
+        return
+    state: Cache = Cache(f".{index}.sync", state_dir)
+    previous: dict = state.load() if state.exists() else {}
+    current: dict = {}
     for cache in Cache.all():
         post: Post = Post.load(cache.load())
         print(post.date, post.title)
-        cluster.save(post)
+        current[post.slug] = cluster.sync(post, previous.get(post.slug, {}))
+    for slug in sorted(previous):
+        if slug not in current:
+            print("Deleted:", slug)
+            cluster.delete(slug)
+    state.save(current)
 
 
 @begin.subcommand
+@Profiler.profile
 def ask(
     question="",
     hostname="localhost",
     protocol="https",
     port=9200,
+    indexes="",
     index="default",
     cache_dir="data",
     gpt_api_key="",
     temperature=0.5,
     limit=1000,
+    budget=500,
+    oov="random",
 ):
     """
     Asking the ChatBot with Context Injection.
     Searches for documents in Elasticsearch.
+    Use a list of 'index:cache_dir' pairs to search several blogs at once.
     """
     Cache.PATH = cache_dir
     Gpt.API_KEY = gpt_api_key
     Gpt.TEMPERATURE = float(temperature)
+    Gpt.MAX_PROMPT_TOKENS = int(budget)
+    Vector.OOV = oov
     cluster: Cluster = Cluster()
     cluster.hostname = hostname
     cluster.port = int(port)
     cluster.protocol = protocol
     cluster.index = index
-    posts: List[Post] = cluster.search(Vector.to_vectors(question), limit=Gpt.MAX_CONTEXT_DOCUMENTS_SIZE)
+    if indexes:
+        posts: List[Post] = Federation.parse(cluster, indexes).search(Vector.to_vectors(question), limit=Gpt.MAX_CONTEXT_CANDIDATES)
+    else:
+        posts: List[Post] = cluster.search(Vector.to_vectors(question), limit=Gpt.MAX_CONTEXT_CANDIDATES)
     gpt: Gpt = Gpt()
     answer: str = gpt.ask(question=question, context=posts, limit=int(limit))
     print("")
     print("Question:", question)
     print("Answer:", answer)
+    print("Tokens:", gpt.context.tokens, "/", gpt.context.budget)
+
+
+@begin.subcommand
+@Profiler.profile
+def replay(
+    capture="capture.jsonl",
+    cache_dir="data",
+    speed=1.0,
+    concurrency=8,
+    delay=0.0,
+    oov="random",
+):
+    """
+    Replays captured /ask traffic against the local server.
+    Elasticsearch and GPT are replaced by local stubs, backed by the cache dir.
+    """
+    Cache.PATH = cache_dir
+    Vector.OOV = oov
+    SearchStub.load(Cluster())
+    CompletionsStub.DELAY = float(delay)
+    search = SearchStub.start()
+    completions = CompletionsStub.start()
+    os.environ.pop("BENJI_CAPTURE_PATH", None)
+    os.environ.pop("BENJI_SEARCH_INDEXES", None)
+    os.environ["BENJI_DATA_PATH"] = cache_dir
+    os.environ["BENJI_GPT_API_KEY"] = "replay"
+    os.environ["BENJI_VECTOR_OOV"] = oov
+    os.environ["BENJI_SEARCH_HOST"] = search.server_address[0]
+    os.environ["BENJI_SEARCH_PORT"] = str(search.server_address[1])
+    os.environ["BENJI_SEARCH_PROTOCOL"] = "http"
+    import server
+    Gpt.URL = f"http://{completions.server_address[0]}:{completions.server_address[1]}/v1/completions"
+    client = server.app.test_client()
+
+    def send(record: dict) -> dict:
+        response = client.post("/ask", json={"question": record["question"], "tokens": record.get("tokens", 1000)})
+        data: dict = response.get_json(silent=True) or {}
+        return {
+            "status": response.status_code,
+            "degraded": data.get("degraded"),
+            "slugs": [post["slug"] for post in data.get("posts", [])],
+        }
+
+    report: dict = Replay(list(Capture.read(capture)), float(speed), int(concurrency)).run(send).report()
+    search.shutdown()
+    completions.shutdown()
+    print(json.dumps(report, indent=4, sort_keys=True))
 
 
 @begin.start
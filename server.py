@@ -1,29 +1,79 @@
 import os
-from typing import List
-from flask import Flask, request
+import time
+import hmac
+from typing import List, Optional
+import requests
+from flask import Flask, request, g
 from app.cache import Cache
 from app.vector import Vector
 from app.gpt import Gpt
 from app.cluster import Cluster
 from app.post import Post
+from app.federation import Federation
+from app.admission import Admission, AdmissionError
+from app.deadline import Deadline
+from app.capture import Capture
+from app.profiler import Profiler
 
 Cache.PATH = os.environ.get('BENJI_DATA_PATH', '~/data')
 Gpt.API_KEY = os.environ['BENJI_GPT_API_KEY']
 Gpt.TEMPERATURE = 0.5
+Vector.OOV = os.environ.get('BENJI_VECTOR_OOV', 'random')
+Gpt.MAX_PROMPT_TOKENS = int(os.environ.get('BENJI_GPT_PROMPT_TOKENS', '500'))
 cluster: Cluster = Cluster()
 cluster.hostname = os.environ.get('BENJI_SEARCH_HOST', '127.0.0.1')
 cluster.port = int(os.environ.get('BENJI_SEARCH_PORT', '9200'))
 cluster.protocol = os.environ.get('BENJI_SEARCH_PROTOCOL', 'http')
 cluster.index = os.environ.get('BENJI_SEARCH_INDEX', 'benji')
+federation: Federation = Federation.parse(cluster, os.environ.get('BENJI_SEARCH_INDEXES', ''))
+searcher = federation if federation.clusters else cluster
+Admission.CONCURRENCY = int(os.environ.get('BENJI_ASK_CONCURRENCY', '2'))
+Admission.QUEUE_SIZE = int(os.environ.get('BENJI_ASK_QUEUE_SIZE', '4'))
+Admission.WAIT = float(os.environ.get('BENJI_ASK_QUEUE_WAIT', '2'))
+admission: Admission = Admission()
+ASK_DEADLINE: float = float(os.environ.get('BENJI_ASK_DEADLINE', '20'))
+ASK_RETRIEVAL_SHARE: float = float(os.environ.get('BENJI_ASK_RETRIEVAL_SHARE', '0.3'))
+ASK_MIN_GENERATION: float = float(os.environ.get('BENJI_ASK_MIN_GENERATION', '2'))
+PROFILE_TOKEN: str = os.environ.get('BENJI_PROFILE_TOKEN', '')
+PROFILE_DIR: str = os.environ.get('BENJI_PROFILE_DIR', '/tmp')
+capture: Optional[Capture] = Capture(os.environ['BENJI_CAPTURE_PATH']) if os.environ.get('BENJI_CAPTURE_PATH') else None
 
 app = Flask(__name__)
 
 
+@app.before_request
+def start_profiler():
+    token: str = request.headers.get('X-Benji-Profile', '')
+    if PROFILE_TOKEN and token and hmac.compare_digest(token, PROFILE_TOKEN):
+        name: str = f"{request.endpoint}-{int(time.time() * 1000)}-{os.getpid()}.collapsed"
+        g.profiler = Profiler(os.path.join(PROFILE_DIR, name))
+        g.profiler.start()
+
+
+@app.after_request
+def expose_profiler(response):
+    if 'profiler' in g:
+        response.headers['X-Benji-Profile-Path'] = g.profiler.path
+    return response
+
+
+@app.teardown_request
+def stop_profiler(error: Optional[BaseException] = None):
+    profiler: Optional[Profiler] = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+
+
 @app.route('/')
 def hello():
     return 'Hello, World!'
 
 
+@app.errorhandler(AdmissionError)
+def overloaded(error: AdmissionError):
+    return {'error': str(error)}, 503, {'Retry-After': str(error.retry_after)}
+
+
 @app.route('/ask', methods=['GET', 'POST'])
 def ask():
     if request.method == 'GET':
@@ -34,12 +84,67 @@ def ask():
         question: str = request.json.get('question') or ''
         tokens: int = int(request.json.get('tokens') or '1000')
         assert question, request.json
-    posts: List[Post] = cluster.search(Vector.to_vectors(question), limit=Gpt.MAX_CONTEXT_DOCUMENTS_SIZE)
-    gpt: Gpt = Gpt()
-    answer: str = gpt.ask(question=question, context=posts, limit=tokens)
+    deadline: Deadline = Deadline(ASK_DEADLINE)
+    record: dict = {
+        'time': time.time(),
+        'question': question,
+        'tokens': tokens,
+        'status': 200,
+        'slugs': [],
+        'degraded': False,
+        'timings': {},
+    }
+    try:
+        vectors: List[Vector] = Vector.to_vectors(question)
+        if len(vectors) > Cluster.MAX_SEARCH_SIZE:
+            record['status'] = 400
+            return {'error': f"Questions are limited to {Cluster.MAX_SEARCH_SIZE} search words"}, 400
+        with admission.admit(wait=deadline.remaining):
+            start: float = time.monotonic()
+            record['timings']['queue'] = round(start - deadline.start, 4)
+            try:
+                posts: List[Post] = searcher.search(
+                    vectors,
+                    limit=Gpt.MAX_CONTEXT_CANDIDATES,
+                    deadline=deadline.split(ASK_RETRIEVAL_SHARE),
+                )
+            except requests.RequestException as error:
+                print('Unavailable:', error)
+                raise AdmissionError(Admission.RETRY_AFTER, 'Search unavailable') from error
+            retrieved: float = time.monotonic()
+            record['timings']['retrieval'] = round(retrieved - start, 4)
+            gpt: Gpt = Gpt()
+            answer: Optional[str] = None
+            if deadline.remaining >= ASK_MIN_GENERATION:
+                try:
+                    answer = gpt.ask(question=question, context=posts, limit=tokens, deadline=deadline.at)
+                except (requests.RequestException, AssertionError) as error:
+                    print('Degraded:', error)
+            else:
+                gpt.pack(question, posts)
+            posts = gpt.context.posts
+            record['timings']['generation'] = round(time.monotonic() - retrieved, 4)
+            record['slugs'] = [post.slug for post in posts]
+            record['degraded'] = answer is None
+    except AdmissionError:
+        record['status'] = 503
+        raise
+    except Exception:
+        record['status'] = 500
+        raise
+    finally:
+        record['timings']['total'] = round(time.monotonic() - deadline.start, 4)
+        if capture is not None:
+            capture.append(record)
     return {
         'answer': answer,
+        'degraded': answer is None,
         'question': question,
+        'tokens': {
+            'budget': gpt.context.budget,
+            'context': gpt.context.tokens,
+            'usage': gpt.usage,
+        },
         'posts': [
             post.to_small_json()
             for post in posts
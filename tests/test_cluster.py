@@ -0,0 +1,63 @@
+from typing import List
+import numpy as np
+import pytest
+from app.cluster import Cluster
+from app.post import Post
+from app.vector import Vector
+
+
+@pytest.fixture
+def cluster(monkeypatch) -> Cluster:
+    monkeypatch.setattr(Vector, "OOV", "hashed")
+    cluster: Cluster = Cluster()
+    cluster.requests = []
+    monkeypatch.setattr(cluster, "post", lambda endpoint, payload, deadline=None: cluster.requests.append((endpoint, payload)))
+    return cluster
+
+
+def build(words: List[str]) -> Post:
+    post: Post = Post()
+    post.title = "Edge Computing"
+    for position, word in enumerate(words):
+        vector: Vector = Vector()
+        vector.word = word
+        vector.array = np.array([1.0, float(position)])
+        post.vectors.append(vector)
+    return post
+
+
+def endpoints(cluster: Cluster) -> List[str]:
+    return [endpoint for endpoint, payload in cluster.requests]
+
+
+def test_save_deletes_previous_documents_first(cluster: Cluster):
+    cluster.save(build(["edge", "latency"]))
+    assert endpoints(cluster) == [
+        "default/_delete_by_query",
+        "default/_doc/edge_edge-computing",
+        "default/_doc/latency_edge-computing",
+    ]
+
+
+def test_first_sync_deletes_previous_documents(cluster: Cluster):
+    state: dict = cluster.sync(build(["edge", "latency"]), {})
+    assert endpoints(cluster)[0] == "default/_delete_by_query"
+    assert sorted(state["words"]) == ["edge", "latency"]
+
+
+def test_sync_skips_unchanged_posts(cluster: Cluster):
+    state: dict = cluster.sync(build(["edge", "latency"]), {})
+    cluster.requests.clear()
+    assert cluster.sync(build(["edge", "latency"]), state) == state
+    assert cluster.requests == []
+
+
+def test_sync_indexes_changed_words_and_deletes_removed_ones(cluster: Cluster):
+    state: dict = cluster.sync(build(["edge", "latency"]), {})
+    cluster.requests.clear()
+    cluster.sync(build(["edge", "bandwidth"]), state)
+    assert endpoints(cluster) == [
+        "default/_doc/bandwidth_edge-computing",
+        "default/_delete_by_query",
+    ]
+    assert cluster.requests[-1][1]["query"]["bool"]["filter"][1] == {"terms": {"keyword": ["latency"]}}
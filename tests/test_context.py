@@ -0,0 +1,49 @@
+import pytest
+from app.context import Context
+from app.post import Post
+from app.tokenizer import Tokenizer
+
+
+@pytest.fixture(autouse=True)
+def words(monkeypatch):
+    monkeypatch.setattr(Tokenizer, "count", classmethod(lambda cls, text: len(text.split())))
+
+
+def build(title: str, score: float, summary: str = "", goal: str = "", keywords: list = None) -> Post:
+    post: Post = Post()
+    post.title = title
+    post.url = f"https://example.com/{title}"
+    post.score = score
+    post.summary = summary
+    post.goal = goal
+    post.keywords = keywords or []
+    return post
+
+
+def test_pack_adds_posts_by_score():
+    posts: list = [build("low", 1.0, summary="Low."), build("high", 2.0, summary="High.")]
+    context: Context = Context(1000).pack(posts)
+    assert [post.title for post in context.posts] == ["high", "low"]
+    assert context.tokens == sum([Tokenizer.count(line) for line in context.lines])
+
+
+def test_pack_falls_back_to_shorter_fields():
+    post: Post = build("post", 1.0, summary="A long summary " * 10, goal="A goal.")
+    line: str = Context.describe(post, "goal")
+    context: Context = Context(Tokenizer.count(line)).pack([post])
+    assert context.lines == [line]
+
+
+def test_pack_respects_the_budget():
+    posts: list = [build(f"post{index}", float(index), summary="A summary.") for index in range(5)]
+    budget: int = 2 * Tokenizer.count(Context.describe(posts[0], "summary"))
+    context: Context = Context(budget)
+    context.reserve("A header")
+    context.pack(posts)
+    assert [post.title for post in context.posts] == ["post4"]
+    assert context.tokens <= context.budget
+
+
+def test_pack_skips_posts_without_fields():
+    context: Context = Context(1000).pack([build("empty", 1.0)])
+    assert context.posts == [] and context.tokens == 0
@@ -0,0 +1,28 @@
+import pytest
+from app.gpt import Gpt
+
+
+def test_parse_enrichment():
+    text: str = 'Sure: {"summary": " A summary. ", "goal": "A goal.", "keywords": ["ai", " nlp ", ""]}'
+    assert Gpt.parse_enrichment(text) == {
+        "summary": "A summary.",
+        "goal": "A goal.",
+        "keywords": ["ai", "nlp"],
+    }
+
+
+def test_parse_enrichment_with_comma_separated_keywords():
+    text: str = '{"summary": "A summary.", "goal": "A goal.", "keywords": "ai, nlp"}'
+    assert Gpt.parse_enrichment(text)["keywords"] == ["ai", "nlp"]
+
+
+@pytest.mark.parametrize("text", [
+    'No JSON here',
+    '{"summary": "A summary.", "goal": "A goal.", "keywords": ["ai"',
+    '{"goal": "A goal.", "keywords": ["ai"]}',
+    '{"summary": "A summary.", "goal": "", "keywords": ["ai"]}',
+    '{"summary": "A summary.", "goal": "A goal.", "keywords": [1, 2]}',
+])
+def test_parse_enrichment_rejects_invalid_responses(text: str):
+    with pytest.raises(ValueError):
+        Gpt.parse_enrichment(text)
@@ -0,0 +1,35 @@
+import os
+from begin import cmdline, subcommands
+from app.profiler import Profiler
+
+
+def run(*argv: str) -> dict:
+    collector: subcommands.Collector = subcommands.Collector()
+    calls: dict = {}
+
+    @Profiler.profile
+    def command(hostname="localhost", protocol="https", port=9200):
+        calls.update(hostname=hostname, protocol=protocol, port=port)
+
+    def main():
+        pass
+
+    collector.register(command)
+    parser = cmdline.create_parser(main, collector=collector)
+    cmdline.apply_options(main, parser.parse_args(["command", *argv]), run_main=False, collector=collector)
+    return calls
+
+
+def test_profile_option_is_passed_by_name():
+    assert run("--hostname", "example.com") == {"hostname": "example.com", "protocol": "https", "port": 9200}
+
+
+def test_profile_option_keeps_existing_short_flags():
+    assert run("-p", "9201")["port"] == "9201"
+
+
+def test_profile_option_writes_a_profile(tmp_path):
+    path: str = os.path.join(tmp_path, "command.collapsed")
+    run("--profile", path)
+    assert os.path.isfile(path)
+    assert os.path.isfile(f"{path}.txt")
@@ -0,0 +1,23 @@
+import time
+from app.replay import Replay
+
+
+def test_latency_includes_the_wait_for_a_sender():
+    records: list = [{"time": 0.0, "question": "a"}, {"time": 0.0, "question": "b"}]
+
+    def send(record: dict) -> dict:
+        time.sleep(0.2)
+        return {"status": 200}
+
+    results: list = sorted(Replay(records, speed=0, concurrency=1).run(send).results, key=lambda result: result["latency"])
+    assert results[0]["latency"] >= 0.2
+    assert results[1]["latency"] >= 0.4
+
+
+def test_report_counts_status_changes():
+    records: list = [{"time": 0.0, "question": "a", "status": 503}, {"time": 0.01, "question": "b"}]
+    report: dict = Replay(records).run(lambda record: {"status": 200}).report()
+    assert report["requests"] == 2
+    assert report["recorded_shed"] == 1
+    assert report["shed"] == 0
+    assert report["status_changes"] == 1
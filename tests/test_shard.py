@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import spacy
+from app.shard import Shard
+from app.vector import Vector
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = spacy.blank("en")
+    model.vocab.reset_vectors(width=4)
+    monkeypatch.setattr(Vector, "_model", model, raising=False)
+    monkeypatch.setattr(Vector, "OOV", "random")
+    return model
+
+
+def test_new_words_get_the_same_vector_in_every_shard(model):
+    first: Shard = Shard("", [])
+    second: Shard = Shard("", [])
+    Vector.embed("serverless edge", first.delta)
+    Vector.embed("edge computing", second.delta)
+    assert np.array_equal(first.delta["edge"], second.delta["edge"])
+    assert not np.array_equal(first.delta["edge"], first.delta["serverless"])
+
+
+def test_merge_keeps_every_new_word(model):
+    first: Shard = Shard("", [])
+    second: Shard = Shard("", [])
+    Vector.embed("serverless edge", first.delta)
+    Vector.embed("edge computing", second.delta)
+    delta: dict = Shard.merge([first, second])
+    assert sorted(delta) == ["computing", "edge", "serverless"]
+    assert np.array_equal(delta["edge"], Vector.generate_random_vector("edge"))
+
+
+def test_vectorize_keeps_the_delta_of_a_failed_shard(model, tmp_path):
+    shard: Shard = Shard(str(tmp_path), ["missing"])
+    shard.delta["edge"] = Vector.generate_random_vector("edge")
+    shard.vectorize()
+    assert shard.error
+    assert list(Shard.merge([shard])) == ["edge"]
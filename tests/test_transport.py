@@ -0,0 +1,106 @@
+from typing import List
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from app.transport import Transport, Breaker, CircuitOpenError
+
+URL: str = "http://upstream:9200/index/_search"
+
+
+class Session:
+    """
+    Fake Session answering with a list of responses or errors.
+    """
+
+    def __init__(self, outcomes: list):
+        self.outcomes: list = outcomes
+        self.calls: int = 0
+
+    def request(self, **kwargs) -> requests.Response:
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def respond(status: int, retry_after: str = "") -> requests.Response:
+    response: requests.Response = requests.Response()
+    response.status_code = status
+    if retry_after:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+def refused() -> requests.ConnectionError:
+    return requests.ConnectionError(MaxRetryError(None, URL, NewConnectionError(None, "Connection refused")))
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(outcomes: list) -> Session:
+        fake: Session = Session(outcomes)
+        monkeypatch.setattr(Transport, "session", classmethod(lambda cls: fake))
+        return fake
+    monkeypatch.setattr(Transport, "_breakers", {})
+    monkeypatch.setattr("app.transport.time.sleep", lambda delay: None)
+    return install
+
+
+def test_idempotent_requests_retry_read_timeouts(session):
+    fake: Session = session([requests.ReadTimeout(), respond(200)])
+    assert Transport.post(URL, idempotent=True).status_code == 200
+    assert fake.calls == 2
+
+
+def test_non_idempotent_requests_do_not_retry_once_sent(session):
+    fake: Session = session([requests.ConnectionError("Connection aborted"), respond(200)])
+    with pytest.raises(requests.ConnectionError):
+        Transport.post(URL)
+    assert fake.calls == 1
+
+
+def test_non_idempotent_requests_retry_connection_errors(session):
+    fake: Session = session([refused(), requests.ConnectTimeout(), respond(200)])
+    assert Transport.post(URL).status_code == 200
+    assert fake.calls == 3
+
+
+@pytest.mark.parametrize("response, calls", [
+    (respond(500), 1),
+    (respond(503), 1),
+    (respond(503, retry_after="1"), Transport.MAX_RETRIES + 1),
+    (respond(429, retry_after="1"), Transport.MAX_RETRIES + 1),
+])
+def test_non_idempotent_requests_retry_rejections_only(session, response: requests.Response, calls: int):
+    fake: Session = session([response])
+    assert Transport.post(URL).status_code == response.status_code
+    assert fake.calls == calls
+
+
+def test_breaker_opens_after_consecutive_failed_requests(session):
+    session([respond(500)])
+    for _ in range(Breaker.THRESHOLD):
+        Transport.post(URL)
+    with pytest.raises(CircuitOpenError):
+        Transport.post(URL)
+
+
+def test_breaker_ignores_throttling(session):
+    session([respond(429)])
+    for _ in range(Breaker.THRESHOLD):
+        Transport.post(URL)
+    assert Transport.breaker(URL).allow()
+
+
+def test_breaker_closes_after_a_success(monkeypatch):
+    now: List[float] = [0.0]
+    monkeypatch.setattr("app.transport.time.monotonic", lambda: now[0])
+    breaker: Breaker = Breaker("upstream")
+    for _ in range(Breaker.THRESHOLD):
+        breaker.failure()
+    assert not breaker.allow()
+    now[0] = Breaker.COOLDOWN
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.failures == 0 and breaker.allow()